@@ -8,96 +8,189 @@ Rate Limits:
 - 5 calls per minute
 """
 
+import random
 import time
 import json
-from datetime import datetime, timedelta
+import logging
+import threading
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Dict, Optional, List
+from urllib.parse import urlencode
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from cache import FileCache
+
+logger = logging.getLogger(__name__)
+
+
+# How long cached responses stay fresh, by API function (aligned to data cadence)
+CACHE_TTL = {
+    'OVERVIEW': timedelta(days=30),
+    'INCOME_STATEMENT': timedelta(days=90),
+    'BALANCE_SHEET': timedelta(days=90),
+    'CASH_FLOW': timedelta(days=90),
+    'EARNINGS': timedelta(days=7),
+}
+
+# A response is only cached when it carries one of these keys for its function,
+# so throttle/info payloads never get pinned for the TTL
+CACHE_REQUIRED_KEYS = {
+    'OVERVIEW': ('Symbol',),
+    'INCOME_STATEMENT': ('annualReports', 'quarterlyReports'),
+    'BALANCE_SHEET': ('annualReports', 'quarterlyReports'),
+    'CASH_FLOW': ('annualReports', 'quarterlyReports'),
+    'EARNINGS': ('annualEarnings', 'quarterlyEarnings'),
+}
+
+
+# Retry policy for transient failures (network errors, 429/5xx, rate-limit notes)
+MAX_ATTEMPTS = 5
+BACKOFF_INITIAL_SEC = 2
+BACKOFF_MAX_SEC = 60
+
+# Minute window length, plus a safety margin so we never land on its edge
+RATE_WINDOW_SEC = 60
+RATE_WINDOW_MARGIN_SEC = 1
+
+
+class AlphaVantageRateLimitError(Exception):
+    """Alpha Vantage answered with a rate-limit 'Note' or 'Information' instead of data"""
+
+
+class AlphaVantageQuotaError(AlphaVantageRateLimitError):
+    """Alpha Vantage answered with an 'Information' quota message; retrying won't help today"""
+
+
+def _is_retryable(e: Exception) -> bool:
+    """Transient errors worth retrying; API errors and bad requests are not."""
+    if isinstance(e, AlphaVantageQuotaError):
+        return False
+    if isinstance(e, AlphaVantageRateLimitError):
+        return True
+    if isinstance(e, requests.HTTPError):
+        status = e.response.status_code if e.response is not None else None
+        return status == 429 or (status is not None and status >= 500)
+    return isinstance(e, (requests.ConnectionError, requests.Timeout))
 
 
 class AlphaVantageRateLimiter:
     """
     Rate limiter specifically for Alpha Vantage API
     Free tier: 25 calls/day, 5 calls/minute
+    
+    The minute limit is a true sliding window: the (reserved) start times of
+    the last calls_per_minute calls, and a new call starts once the oldest of
+    them is a full window old. Acquiring is O(1).
     """
     
     def __init__(self, calls_per_minute: int = 5, calls_per_day: int = 25):
         self.calls_per_minute = calls_per_minute
         self.calls_per_day = calls_per_day
         
-        # Track calls in last minute
-        self.minute_calls = deque()
+        # Monotonic start times reserved for the most recent calls (oldest first)
+        self._window = deque(maxlen=calls_per_minute)
+        
+        # Track calls today, keyed on the calendar day's ordinal
+        self.daily_count = 0
+        self._day_id = datetime.now().toordinal()
         
-        # Track calls today
-        self.daily_calls = []
-        self.current_date = datetime.now().date()
+        # Serialize access so concurrent fetches share one budget
+        self._lock = threading.Lock()
     
     def wait_if_needed(self):
-        """Wait if rate limits would be exceeded"""
-        now = time.time()
-        current_date = datetime.now().date()
+        """Wait if rate limits would be exceeded (thread-safe)"""
+        # Reserve the slot under the lock, then sleep outside it so other callers
+        # (and get_usage_stats) never block behind a waiting worker
+        with self._lock:
+            wait_time = self._reserve_slot()
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    def _reserve_slot(self) -> float:
+        """Record the next call and return how long to wait before making it (caller holds the lock)"""
+        # One snapshot of each clock per call: monotonic for the window (immune
+        # to wall-clock jumps), wall clock only for the calendar-day budget
+        now = time.monotonic()
+        wall_now = datetime.now()
+        day_id = wall_now.toordinal()
         
         # Reset daily counter if new day
-        if current_date != self.current_date:
-            self.daily_calls = []
-            self.current_date = current_date
-            print(f"   ðŸ“… New day - daily call counter reset")
+        if day_id != self._day_id:
+            self.daily_count = 0
+            self._day_id = day_id
+            logger.info(f"   ðŸ“… New day - daily call counter reset")
         
         # Check daily limit
-        if len(self.daily_calls) >= self.calls_per_day:
+        if self.daily_count >= self.calls_per_day:
             # Calculate time until midnight
-            tomorrow = datetime.combine(current_date, datetime.min.time()) + timedelta(days=1)
-            wait_seconds = (tomorrow - datetime.now()).total_seconds()
+            tomorrow = datetime.fromordinal(day_id + 1)
+            wait_seconds = (tomorrow - wall_now).total_seconds()
             hours = int(wait_seconds // 3600)
             minutes = int((wait_seconds % 3600) // 60)
             
-            print(f"   âš ï¸  Daily limit reached ({self.calls_per_day} calls)")
-            print(f"   â°  Resets in {hours}h {minutes}m")
+            logger.warning(f"   âš ï¸  Daily limit reached ({self.calls_per_day} calls)")
+            logger.warning(f"   â°  Resets in {hours}h {minutes}m")
             raise Exception(f"Alpha Vantage daily limit reached. Resets in {hours}h {minutes}m")
         
-        # Clean old calls from minute window
-        cutoff = now - 60
-        while self.minute_calls and self.minute_calls[0] < cutoff:
-            self.minute_calls.popleft()
+        # Check minute limit: a full window means the oldest call must age out
+        slot = now
+        if len(self._window) == self.calls_per_minute:
+            slot = max(now, self._window[0] + RATE_WINDOW_SEC + RATE_WINDOW_MARGIN_SEC)
+            if slot > now:
+                logger.info(f"   â³ Alpha Vantage rate limit: waiting {slot - now:.1f}s before next call...")
+                logger.debug(f"   ðŸ“Š Usage: {len(self._window)}/{self.calls_per_minute} calls/min, {self.daily_count}/{self.calls_per_day} calls/day")
         
-        # Check minute limit
-        if len(self.minute_calls) >= self.calls_per_minute:
-            # Need to wait
-            oldest_call = self.minute_calls[0]
-            wait_time = 60 - (now - oldest_call) + 1  # +1 for safety margin
-            
-            print(f"   â³ Alpha Vantage rate limit: waiting {wait_time:.1f}s before next call...")
-            print(f"   ðŸ“Š Usage: {len(self.minute_calls)}/{self.calls_per_minute} calls/min, {len(self.daily_calls)}/{self.calls_per_day} calls/day")
-            
-            time.sleep(wait_time)
-            
-            # Clean again after waiting
-            cutoff = time.time() - 60
-            while self.minute_calls and self.minute_calls[0] < cutoff:
-                self.minute_calls.popleft()
-        
-        # Record this call
-        self.minute_calls.append(now)
-        self.daily_calls.append(now)
+        # Record this call at its reserved start (maxlen drops the oldest)
+        self._window.append(slot)
+        self.daily_count += 1
+        return slot - now
+    
+    def record_rejection(self):
+        """
+        The server rejected the last call as rate limited: refund its daily slot
+        and fill the minute window so the next call waits out a full window.
+        """
+        with self._lock:
+            self.daily_count = max(0, self.daily_count - 1)
+            # Never before an already reserved slot, so the window stays ordered
+            latest = max(time.monotonic(), self._window[-1]) if self._window else time.monotonic()
+            self._window.extend([latest] * self.calls_per_minute)
+    
+    def record_quota_exhausted(self):
+        """The server reported its daily quota spent: exhaust the local budget so later calls fail fast."""
+        with self._lock:
+            self.daily_count = self.calls_per_day
+    
+    def _calls_in_window(self, now: float) -> int:
+        """Calls started within the last window (caller holds the lock)"""
+        cutoff = now - RATE_WINDOW_SEC
+        return sum(1 for t in self._window if t > cutoff)
     
     def get_usage_stats(self) -> Dict:
         """Get current usage statistics"""
-        now = time.time()
-        cutoff = now - 60
-        
-        # Clean old minute calls
-        while self.minute_calls and self.minute_calls[0] < cutoff:
-            self.minute_calls.popleft()
-        
-        return {
-            'calls_last_minute': len(self.minute_calls),
-            'calls_today': len(self.daily_calls),
-            'minute_limit': self.calls_per_minute,
-            'daily_limit': self.calls_per_day,
-            'minute_remaining': self.calls_per_minute - len(self.minute_calls),
-            'daily_remaining': self.calls_per_day - len(self.daily_calls)
-        }
+        with self._lock:
+            calls_last_minute = self._calls_in_window(time.monotonic())
+            
+            # A counter from a previous day has already reset
+            calls_today = self.daily_count if datetime.now().toordinal() == self._day_id else 0
+            
+            return {
+                'calls_last_minute': calls_last_minute,
+                'calls_today': calls_today,
+                'minute_limit': self.calls_per_minute,
+                'daily_limit': self.calls_per_day,
+                'minute_remaining': self.calls_per_minute - calls_last_minute,
+                'daily_remaining': self.calls_per_day - calls_today
+            }
 
 
 class AlphaVantageClient:
@@ -105,7 +198,7 @@ class AlphaVantageClient:
     
     BASE_URL = "https://www.alphavantage.co/query"
     
-    def __init__(self, api_key: str, web_fetch_fn=None):
+    def __init__(self, api_key: str, web_fetch_fn=None, cache_dir: Optional[str] = ".av_cache"):
         """
         Initialize Alpha Vantage client
         
@@ -113,34 +206,76 @@ class AlphaVantageClient:
             api_key: Alpha Vantage API key
             web_fetch_fn: Optional web_fetch function (for Claude environment)
                          If not provided, will try to use requests library
+            cache_dir: Directory for the persistent response cache (None disables).
+                       Cache hits skip both the network and the rate limiter.
         """
         self.api_key = api_key
         self.rate_limiter = AlphaVantageRateLimiter()
         self.web_fetch_fn = web_fetch_fn
+        self.cache = FileCache(cache_dir) if cache_dir else None
         
         # Only create session if we're not using web_fetch
         if not self.web_fetch_fn:
             self.session = requests.Session()
+            # Room for concurrent fetches to keep their connections alive;
+            # retries stay in _make_request so each one re-acquires a rate slot
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+            self.session.mount("https://", adapter)
     
     def _make_request(self, params: Dict) -> Dict:
-        """Make API request with rate limiting"""
+        """Make API request with rate limiting (served from cache when fresh)"""
+        function = params.get('function')
+        cache_key = f"{function}:{params.get('symbol', '')}"
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         # Add API key to params
         params['apikey'] = self.api_key
         
+        # Retry transient failures with exponential backoff + jitter; each
+        # attempt re-acquires a rate-limit slot
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                data = self._fetch(params)
+                break
+            except Exception as e:
+                rate_limited = isinstance(e, AlphaVantageRateLimitError)
+                if isinstance(e, AlphaVantageQuotaError):
+                    # Nothing more gets through today; later calls raise before the network
+                    self.rate_limiter.record_quota_exhausted()
+                elif rate_limited:
+                    # Rejected calls don't spend the local daily budget, and the
+                    # next attempt waits out the whole minute window in the limiter
+                    self.rate_limiter.record_rejection()
+                if attempt == MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                if rate_limited:
+                    delay = random.uniform(0, 1)
+                else:
+                    delay = min(BACKOFF_MAX_SEC, BACKOFF_INITIAL_SEC * 2 ** attempt) + random.uniform(0, 1)
+                logger.warning(f"   Alpha Vantage request failed ({e}); retry {attempt + 1}/{MAX_ATTEMPTS - 1} in {delay:.1f}s")
+                time.sleep(delay)
+        
+        if self.cache and function in CACHE_TTL and any(k in data for k in CACHE_REQUIRED_KEYS[function]):
+            self.cache.set(cache_key, data, ttl=CACHE_TTL[function])
+        
+        return data
+    
+    def _fetch(self, params: Dict) -> Dict:
+        """Single rate-limited request; raises AlphaVantageRateLimitError on a rate-limit note"""
         # Wait if needed for rate limits
         self.rate_limiter.wait_if_needed()
         
-        # Build URL
-        from urllib.parse import urlencode
-        url = f"{self.BASE_URL}?{urlencode(params)}"
-        
         # Make request using web_fetch or requests
         if self.web_fetch_fn:
-            # Use web_fetch (Claude environment)
+            # Use web_fetch (Claude environment); it needs the full URL
+            url = f"{self.BASE_URL}?{urlencode(params)}"
             result = self.web_fetch_fn(url)
             # Parse JSON from result
             if isinstance(result, str):
-                data = json.loads(result)
+                data = orjson.loads(result) if HAS_ORJSON else json.loads(result)
             elif isinstance(result, dict):
                 data = result
             else:
@@ -149,7 +284,8 @@ class AlphaVantageClient:
             # Use requests library (standalone Python)
             response = self.session.get(self.BASE_URL, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            # orjson decodes the large statement payloads several times faster
+            data = orjson.loads(response.content) if HAS_ORJSON else response.json()
         
         # Check for API errors
         if 'Error Message' in data:
@@ -157,7 +293,11 @@ class AlphaVantageClient:
         
         if 'Note' in data:
             # Rate limit message
-            raise Exception(f"Alpha Vantage Rate Limit: {data['Note']}")
+            raise AlphaVantageRateLimitError(f"Alpha Vantage Rate Limit: {data['Note']}")
+        
+        if 'Information' in data:
+            # Daily-quota / throttle message (also sent for premium-only endpoints)
+            raise AlphaVantageQuotaError(f"Alpha Vantage Rate Limit: {data['Information']}")
         
         return data
     
@@ -171,7 +311,7 @@ class AlphaVantageClient:
         - 52WeekHigh, 52WeekLow
         - And many more...
         """
-        print(f"   ðŸ“Š Alpha Vantage: Getting company overview for {symbol}")
+        logger.debug(f"   ðŸ“Š Alpha Vantage: Getting company overview for {symbol}")
         
         try:
             params = {
@@ -183,13 +323,13 @@ class AlphaVantageClient:
             
             # Check if we got data
             if not data or 'Symbol' not in data:
-                print(f"   âš ï¸  No overview data found for {symbol}")
+                logger.warning(f"   âš ï¸  No overview data found for {symbol}")
                 return None
             
             return data
             
         except Exception as e:
-            print(f"   âŒ Error getting overview for {symbol}: {e}")
+            logger.error(f"   âŒ Error getting overview for {symbol}: {e}")
             return None
     
     def get_income_statement(self, symbol: str, quarterly: bool = False) -> Optional[Dict]:
@@ -201,7 +341,7 @@ class AlphaVantageClient:
         - Each report has: fiscalDateEnding, totalRevenue, costOfRevenue, 
           grossProfit, operatingIncome, netIncome, etc.
         """
-        print(f"   ðŸ“Š Alpha Vantage: Getting income statement for {symbol}")
+        logger.debug(f"   ðŸ“Š Alpha Vantage: Getting income statement for {symbol}")
         
         try:
             params = {
@@ -214,18 +354,18 @@ class AlphaVantageClient:
             # Check if we got data
             report_key = 'quarterlyReports' if quarterly else 'annualReports'
             if not data or report_key not in data:
-                print(f"   âš ï¸  No income statement data found for {symbol}")
+                logger.warning(f"   âš ï¸  No income statement data found for {symbol}")
                 return None
             
             return data
             
         except Exception as e:
-            print(f"   âŒ Error getting income statement for {symbol}: {e}")
+            logger.error(f"   âŒ Error getting income statement for {symbol}: {e}")
             return None
     
     def get_balance_sheet(self, symbol: str, quarterly: bool = False) -> Optional[Dict]:
         """Get balance sheet (annual or quarterly)"""
-        print(f"   ðŸ“Š Alpha Vantage: Getting balance sheet for {symbol}")
+        logger.debug(f"   ðŸ“Š Alpha Vantage: Getting balance sheet for {symbol}")
         
         try:
             params = {
@@ -237,18 +377,18 @@ class AlphaVantageClient:
             
             report_key = 'quarterlyReports' if quarterly else 'annualReports'
             if not data or report_key not in data:
-                print(f"   âš ï¸  No balance sheet data found for {symbol}")
+                logger.warning(f"   âš ï¸  No balance sheet data found for {symbol}")
                 return None
             
             return data
             
         except Exception as e:
-            print(f"   âŒ Error getting balance sheet for {symbol}: {e}")
+            logger.error(f"   âŒ Error getting balance sheet for {symbol}: {e}")
             return None
     
     def get_cash_flow(self, symbol: str, quarterly: bool = False) -> Optional[Dict]:
         """Get cash flow statement (annual or quarterly)"""
-        print(f"   ðŸ“Š Alpha Vantage: Getting cash flow for {symbol}")
+        logger.debug(f"   ðŸ“Š Alpha Vantage: Getting cash flow for {symbol}")
         
         try:
             params = {
@@ -260,13 +400,13 @@ class AlphaVantageClient:
             
             report_key = 'quarterlyReports' if quarterly else 'annualReports'
             if not data or report_key not in data:
-                print(f"   âš ï¸  No cash flow data found for {symbol}")
+                logger.warning(f"   âš ï¸  No cash flow data found for {symbol}")
                 return None
             
             return data
             
         except Exception as e:
-            print(f"   âŒ Error getting cash flow for {symbol}: {e}")
+            logger.error(f"   âŒ Error getting cash flow for {symbol}: {e}")
             return None
     
     def get_earnings(self, symbol: str) -> Optional[Dict]:
@@ -277,7 +417,7 @@ class AlphaVantageClient:
         - annualEarnings: List of {fiscalDateEnding, reportedEPS}
         - quarterlyEarnings: List of same
         """
-        print(f"   ðŸ“Š Alpha Vantage: Getting earnings for {symbol}")
+        logger.debug(f"   ðŸ“Š Alpha Vantage: Getting earnings for {symbol}")
         
         try:
             params = {
@@ -288,15 +428,32 @@ class AlphaVantageClient:
             data = self._make_request(params)
             
             if not data or 'annualEarnings' not in data:
-                print(f"   âš ï¸  No earnings data found for {symbol}")
+                logger.warning(f"   âš ï¸  No earnings data found for {symbol}")
                 return None
             
             return data
             
         except Exception as e:
-            print(f"   âŒ Error getting earnings for {symbol}: {e}")
+            logger.error(f"   âŒ Error getting earnings for {symbol}: {e}")
             return None
     
+    def get_company_overviews(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get company overviews for many symbols.
+        
+        Symbols are fanned out to up to calls_per_minute workers sharing the
+        rate limiter, so the minute budget is used as soon as it frees up
+        rather than one request at a time.
+        
+        Returns dict of symbol -> overview (None when unavailable).
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        workers = min(self.rate_limiter.calls_per_minute, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(symbols, pool.map(self.get_company_overview, symbols)))
+    
     def get_usage_stats(self) -> Dict:
         """Get current API usage statistics"""
         return self.rate_limiter.get_usage_stats()
@@ -310,6 +467,8 @@ def test_alpha_vantage():
     # Use API key from environment or parameter
     api_key = "IBOQYCMYZYBISLL5"
     
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     print("=" * 80)
     print("TESTING ALPHA VANTAGE INTEGRATION")
     print("=" * 80)
@@ -6,14 +6,42 @@ Enriches constituent securities. Avoids duplicate fetches within run
 """
 
 import sqlite3
-import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from equity_analyst_autonomous import AutonomousEquityAnalyst
+from equity_analyst_autonomous import AutonomousEquityAnalyst, STALENESS_DAYS, YAHOO_REQUEST_DELAY_SEC
 
-# Delay between Yahoo requests to avoid rate limiting
-REQUEST_DELAY_SEC = 0.3
+# Concurrent Yahoo requests in flight (the analyst spaces their starts)
+MAX_WORKERS = 8
+
+# Fetched securities are written in batches of this size (one transaction each)
+SAVE_BATCH_SIZE = 500
+
+
+def _fresh_symbols(conn: sqlite3.Connection) -> set:
+    """
+    Symbols whose price/performance data is younger than STALENESS_DAYS.
+    _fetch_security_data would only return the cached row for these, so they
+    are skipped before fetching rather than re-fetched and re-saved.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT symbol FROM securities
+        WHERE last_updated >= datetime('now', ?)
+          AND (current_price IS NOT NULL OR year_performance IS NOT NULL)
+    """, (f"-{STALENESS_DAYS} days",))
+    return set(row[0] for row in cursor.fetchall())
+
+
+def _fetch_etf(analyst: AutonomousEquityAnalyst, sym: str):
+    """Fetch ETF security data and holdings (runs in a worker thread)."""
+    return sym, analyst._fetch_security_data(sym), analyst.fetch_etf_holdings(sym)
+
+
+def _fetch_constituent(analyst: AutonomousEquityAnalyst, sym: str):
+    """Fetch constituent security data (runs in a worker thread)."""
+    return sym, analyst._fetch_security_data(sym)
 
 
 def main():
@@ -25,6 +53,7 @@ def main():
     parser.add_argument("--constituent-start", type=int, default=0, help="Start at constituent index (for --constituents-only)")
     parser.add_argument("--constituent-limit", type=int, default=None, help="Max constituents to process (for --constituents-only)")
     parser.add_argument("--remaining-only", action="store_true", help="Only fetch constituents lacking sector/description (skip already enriched)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Concurrent Yahoo requests (default: {MAX_WORKERS}; starts are still spaced {YAHOO_REQUEST_DELAY_SEC}s apart)")
     args = parser.parse_args()
 
     cfg = yaml.safe_load(Path("config.yaml").read_text())
@@ -32,46 +61,59 @@ def main():
 
     analyst = AutonomousEquityAnalyst(db_path=db_path)
 
-    conn = sqlite3.connect(db_path)
+    # One read connection for the whole run; autocommit so it never holds a
+    # transaction open while the analyst writes
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        _backfill(args, analyst, conn)
+    finally:
+        conn.close()
+
+
+def _backfill(args, analyst: AutonomousEquityAnalyst, conn: sqlite3.Connection):
+    """Run the ETF and constituent steps, reading from conn."""
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT constituent_symbol FROM etf_holdings ORDER BY constituent_symbol")
     all_constituents = sorted(row[0] for row in cursor.fetchall())
-    conn.close()
 
     if args.constituents_only:
-        constituents = all_constituents[args.constituent_start:]
-        if args.constituent_limit:
-            constituents = constituents[: args.constituent_limit]
         if args.remaining_only:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            # Slice the stable, ordered constituent list first (so chunked resumes
+            # keep their offsets), then anti-join: no sector, GICS sector or description
             cursor.execute("""
-                SELECT symbol FROM securities
-                WHERE (sector IS NOT NULL AND TRIM(sector) != '')
-                   OR (gics_sector IS NOT NULL AND TRIM(gics_sector) != '')
-                   OR (description IS NOT NULL AND TRIM(description) != '')
-            """)
-            already_enriched = set(row[0] for row in cursor.fetchall())
-            conn.close()
-            constituents = [c for c in constituents if c not in already_enriched]
-            print(f"Constituent enrichment (remaining only): {len(constituents)} to fetch (skipping {len(already_enriched)} already enriched)")
+                SELECT h.constituent_symbol
+                FROM (
+                    SELECT DISTINCT constituent_symbol FROM etf_holdings
+                    ORDER BY constituent_symbol
+                    LIMIT ? OFFSET ?
+                ) h
+                LEFT JOIN securities s ON s.symbol = h.constituent_symbol
+                WHERE s.symbol IS NULL
+                   OR (COALESCE(TRIM(s.sector), '') = ''
+                       AND COALESCE(TRIM(s.gics_sector), '') = ''
+                       AND COALESCE(TRIM(s.description), '') = '')
+                ORDER BY h.constituent_symbol
+            """, (args.constituent_limit or -1, args.constituent_start))
+            constituents = [row[0] for row in cursor.fetchall()]
+            print(f"Constituent enrichment (remaining only): {len(constituents)} to fetch (start={args.constituent_start}, of {len(all_constituents)} constituents)")
         else:
+            constituents = all_constituents[args.constituent_start:]
+            if args.constituent_limit:
+                constituents = constituents[: args.constituent_limit]
             print(f"Constituent enrichment only: {len(constituents)} constituents (start={args.constituent_start}, of {len(all_constituents)})")
         print("Deduplication: each symbol fetched at most once per run")
         print()
         fetched_this_run = set()
         stats = {"etfs_fetched": 0, "holdings_saved": 0, "constituents_fetched": 0}
     else:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
         cursor.execute("""
             SELECT symbol, name FROM securities
             WHERE UPPER(COALESCE(asset_type, '')) = 'ETF'
             ORDER BY symbol
         """)
         all_etfs = [dict(row) for row in cursor.fetchall()]
-        conn.close()
 
         etfs = all_etfs[args.start:]
         if args.limit:
@@ -90,57 +132,78 @@ def main():
         all_constituents_set = set()
         stats = {"etfs_fetched": 0, "holdings_saved": 0, "constituents_fetched": 0}
 
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
         print("=" * 60)
         print("STEP 1: Fetch and save ETF data + holdings")
         print("=" * 60)
-        for i, etf in enumerate(etfs):
-            sym = etf["symbol"]
-            if (i + 1) % 100 == 0 or i == 0:
-                print(f"  Progress: {i + 1}/{len(etfs)} ETFs...")
-            if sym in fetched_this_run:
-                continue
-            data = analyst._fetch_security_data(sym)
-            if data:
-                analyst.save_security(data)
-                fetched_this_run.add(sym)
-                stats["etfs_fetched"] += 1
-            time.sleep(REQUEST_DELAY_SEC)
-            holdings = analyst.fetch_etf_holdings(sym)
-            if holdings:
-                analyst.save_etf_holdings(sym, holdings, source="yahoo")
-                stats["holdings_saved"] += 1
-                for h in holdings:
-                    all_constituents_set.add(h["symbol"])
-            time.sleep(REQUEST_DELAY_SEC)
+        # Fetch in worker threads; save on this thread so SQLite has one writer
+        pending = []
+        try:
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                futures = [pool.submit(_fetch_etf, analyst, etf["symbol"]) for etf in etfs]
+                try:
+                    for i, future in enumerate(as_completed(futures)):
+                        if (i + 1) % 100 == 0 or i == 0:
+                            print(f"  Progress: {i + 1}/{len(etfs)} ETFs...")
+                        sym, data, holdings = future.result()
+                        if data:
+                            pending.append(data)
+                            if len(pending) >= SAVE_BATCH_SIZE:
+                                analyst.save_securities_batch(pending)
+                                pending = []
+                            fetched_this_run.add(sym)
+                            stats["etfs_fetched"] += 1
+                        if holdings:
+                            analyst.save_etf_holdings(sym, holdings, source="yahoo")
+                            stats["holdings_saved"] += 1
+                            for h in holdings:
+                                all_constituents_set.add(h["symbol"])
+                except BaseException:
+                    # On abort (Ctrl-C, save error) drop the queued fetches instead
+                    # of running them all before the exception propagates
+                    pool.shutdown(cancel_futures=True)
+                    raise
+        finally:
+            # Keep what was fetched even on abort; the pool has already shut down
+            analyst.save_securities_batch(pending)
 
         cursor.execute("SELECT DISTINCT constituent_symbol FROM etf_holdings")
         for row in cursor.fetchall():
             all_constituents_set.add(row[0])
-        conn.close()
 
         constituents = sorted(all_constituents_set)
     print(f"\n  Unique constituents from holdings: {len(constituents)}")
+    fresh = _fresh_symbols(conn)
+    skipped_fresh = sum(1 for c in constituents if c in fresh)
+    constituents = [c for c in constituents if c not in fresh]
+    print(f"  Skipping {skipped_fresh} with data fresher than {STALENESS_DAYS} days")
     print()
     print("=" * 60)
     print("STEP 2: Enrich constituent securities")
     print("=" * 60)
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    for i, sym in enumerate(constituents):
-        if (i + 1) % 200 == 0 or (i < 5 and i >= 0):
-            print(f"  Progress: {i + 1}/{len(constituents)} constituents...")
-        if sym in fetched_this_run:
-            continue
-        data = analyst._fetch_security_data(sym)
-        if data:
-            analyst.save_security(data)
-            fetched_this_run.add(sym)
-            stats["constituents_fetched"] += 1
-        time.sleep(REQUEST_DELAY_SEC)
-    conn.close()
+    to_fetch = [sym for sym in constituents if sym not in fetched_this_run]
+    pending = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(_fetch_constituent, analyst, sym) for sym in to_fetch]
+            try:
+                for i, future in enumerate(as_completed(futures)):
+                    if (i + 1) % 200 == 0 or i < 5:
+                        print(f"  Progress: {i + 1}/{len(to_fetch)} constituents...")
+                    sym, data = future.result()
+                    if data:
+                        pending.append(data)
+                        if len(pending) >= SAVE_BATCH_SIZE:
+                            analyst.save_securities_batch(pending)
+                            pending = []
+                        fetched_this_run.add(sym)
+                        stats["constituents_fetched"] += 1
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+    finally:
+        # Keep what was fetched even on abort; the pool has already shut down
+        analyst.save_securities_batch(pending)
 
     print()
     print("=" * 60)
@@ -18,8 +18,12 @@ def main():
 
     analyst = AutonomousEquityAnalyst(db_path=db_path)
 
+    # One read connection for the whole run (writes go through analyst)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
     cursor = conn.cursor()
     cursor.execute("""
         SELECT symbol, name FROM securities
@@ -28,10 +32,10 @@ def main():
         LIMIT 10
     """)
     etfs = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     if not etfs:
         print("No ETFs found in database.")
+        conn.close()
         return
 
     print(f"Backfilling {len(etfs)} ETFs: {[e['symbol'] for e in etfs]}")
@@ -80,10 +84,6 @@ def main():
     print("UPDATED DATA FOR REVIEW")
     print("=" * 60)
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
     print("\n--- ETFs (backfilled) ---")
     cursor.execute("""
         SELECT symbol, name, asset_type, market_cap, sector, current_price,
@@ -101,12 +101,16 @@ def main():
               f"updated={r['last_updated']}")
 
     # Show holdings for first ETF that has them
-    etf_with_holdings = None
-    for e in etfs:
-        cursor.execute("SELECT 1 FROM etf_holdings WHERE etf_symbol = ? LIMIT 1", (e["symbol"],))
-        if cursor.fetchone():
-            etf_with_holdings = e["symbol"]
-            break
+    etf_symbols = [e["symbol"] for e in etfs]
+    cursor.execute("""
+        SELECT etf_symbol FROM etf_holdings
+        WHERE etf_symbol IN ({})
+        GROUP BY etf_symbol
+        ORDER BY etf_symbol
+        LIMIT 1
+    """.format(",".join("?" * len(etf_symbols))), etf_symbols)
+    row = cursor.fetchone()
+    etf_with_holdings = row["etf_symbol"] if row else None
     print(f"\n--- ETF Holdings (sample: {etf_with_holdings or 'N/A'}) ---")
     if etf_with_holdings:
         cursor.execute("""
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Persistent file cache with per-entry TTL.
+
+Used by AlphaVantageClient so repeated backfills skip the network (and the
+25 calls/day budget) for fundamentals that change quarterly at most.
+Entries are JSON files named by the md5 of their key.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+
+class FileCache:
+    """JSON file cache keyed by string, with expiry per entry"""
+
+    def __init__(self, cache_dir: str = ".av_cache", default_ttl: timedelta = timedelta(days=30)):
+        self.cache_dir = Path(cache_dir)
+        self.default_ttl = default_ttl
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached data for key, or None if missing, expired or unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return entry.get("data")
+
+    def set(self, key: str, data: Any, ttl: Optional[timedelta] = None):
+        """Store data under key for ttl (default_ttl when not given)."""
+        ttl = ttl or self.default_ttl
+        entry = {
+            "key": key,
+            "expires_at": time.time() + ttl.total_seconds(),
+            "data": data,
+        }
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        # Atomic swap so a concurrent reader never sees a partial file
+        os.replace(tmp_path, path)
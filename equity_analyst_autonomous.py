@@ -13,14 +13,25 @@ This version uses:
 import yfinance as yf
 import sqlite3
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import re
 
+from throttle import MinIntervalThrottle
+
 
 # Price/performance data older than this is considered stale and will be refetched
 STALENESS_DAYS = 7
 
+# Concurrent Yahoo lookups in search_securities (starts spaced by _yahoo_throttle)
+SEARCH_MAX_WORKERS = 8
+
+# Minimum spacing between Yahoo request starts, shared by every thread in the
+# process (to avoid rate limiting; Yahoo 429s otherwise surface as "not found")
+YAHOO_REQUEST_DELAY_SEC = 0.3
+_yahoo_throttle = MinIntervalThrottle(YAHOO_REQUEST_DELAY_SEC)
+
 
 def _normalize_dividend_yield(val) -> Optional[float]:
     """Store dividend yield as percentage (Yahoo format). Convert decimal (e.g. 0.025) to % if needed."""
@@ -55,6 +66,116 @@ def _derived_sector(gics_sector: Optional[str], asset_class: Optional[str]) -> O
     return gics_sector or asset_class
 
 
+def _market_cap_band(market_cap: float) -> str:
+    """Cap band for alignment scoring: small < $2B <= mid <= $10B < large."""
+    if market_cap < 2_000_000_000:
+        return 'small'
+    if market_cap <= 10_000_000_000:
+        return 'mid'
+    return 'large'
+
+
+_CAP_BAND_RATIONALE = {
+    'small': "Small-cap fit",
+    'mid': "Mid-cap fit",
+    'large': "Large-cap fit",
+}
+
+
+# Upsert: fields the source did not provide (None) keep their stored value
+_SAVE_SECURITY_SQL = """
+    INSERT INTO securities 
+    (symbol, name, asset_type, market_cap, sector, industry, gics_sector, gics_industry,
+     sic_code, sic_description, asset_class, description, exchange, currency,
+     current_price, pe_ratio, dividend_yield, year_performance,
+     fifty_two_week_high, fifty_two_week_low, beta, volume, avg_volume, expense_ratio, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+    ON CONFLICT(symbol) DO UPDATE SET
+        -- Descriptive columns keep their stored value when this fetch lacks them;
+        -- price/performance columns always take the fresh value (None included)
+        name = COALESCE(excluded.name, name),
+        asset_type = COALESCE(excluded.asset_type, asset_type),
+        market_cap = COALESCE(excluded.market_cap, market_cap),
+        sector = COALESCE(excluded.sector, sector),
+        industry = COALESCE(excluded.industry, industry),
+        gics_sector = COALESCE(excluded.gics_sector, gics_sector),
+        gics_industry = COALESCE(excluded.gics_industry, gics_industry),
+        sic_code = COALESCE(excluded.sic_code, sic_code),
+        sic_description = COALESCE(excluded.sic_description, sic_description),
+        asset_class = COALESCE(excluded.asset_class, asset_class),
+        description = COALESCE(excluded.description, description),
+        exchange = COALESCE(excluded.exchange, exchange),
+        currency = COALESCE(excluded.currency, currency),
+        current_price = excluded.current_price,
+        pe_ratio = excluded.pe_ratio,
+        dividend_yield = excluded.dividend_yield,
+        year_performance = excluded.year_performance,
+        fifty_two_week_high = excluded.fifty_two_week_high,
+        fifty_two_week_low = excluded.fifty_two_week_low,
+        beta = excluded.beta,
+        volume = excluded.volume,
+        avg_volume = excluded.avg_volume,
+        expense_ratio = COALESCE(excluded.expense_ratio, expense_ratio),
+        last_updated = datetime('now')
+"""
+
+_SAVE_ALIGNMENT_SQL = """
+    INSERT INTO thesis_alignments 
+    (thesis_id, thesis_name, symbol, alignment_score, rationale, 
+     current_price, market_cap, pe_ratio, dividend_yield, year_performance)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Query term -> likely ETF tickers for _generate_search_tickers, in output order.
+# A rule matches when every term of any one of its term tuples is in the query.
+_SEARCH_TICKER_RULES = (
+    ((('small', 'cap'),), ('IWM', 'IJR', 'SCHA', 'VB', 'SLYG', 'SLYV', 'VBR', 'VBK')),
+    ((('mid', 'cap'),), ('IJH', 'MDY', 'VO', 'SCHM', 'IWR', 'VXF')),
+    ((('tech',),), ('XLK', 'VGT', 'QQQ', 'QTEC', 'SOXX', 'IGV', 'FDN')),
+    ((('energy',),), ('XLE', 'VDE', 'IYE', 'FENY', 'IXC', 'PXE')),
+    ((('health',),), ('XLV', 'VHT', 'IYH', 'FHLC', 'IBB', 'XBI')),
+    ((('financial',), ('bank',)), ('XLF', 'VFH', 'IYF', 'KBE', 'KRE', 'IAT')),
+    ((('dividend',), ('income',)), ('VYM', 'DVY', 'SCHD', 'HDV', 'SDY', 'DGRO', 'VIG')),
+    ((('value',),), ('VTV', 'IVE', 'VOOV', 'SCHV', 'IWD', 'VBR')),
+    ((('growth',),), ('VUG', 'IVW', 'VOOG', 'SCHG', 'IWF', 'VBK')),
+    ((('international',), ('emerging',)), ('VEA', 'IEFA', 'VWO', 'IEMG', 'EEM', 'VEU', 'IXUS')),
+    ((('real estate',), ('reit',)), ('VNQ', 'IYR', 'SCHH', 'XLRE', 'RWR', 'USRT')),
+)
+
+# Every rule term in one pattern. The lookahead finds a term at each position, so
+# overlapping occurrences are all seen (no rule term is a prefix of another).
+_SEARCH_TERMS_RE = re.compile('(?=(' + '|'.join(sorted(
+    {re.escape(term) for any_of, _ in _SEARCH_TICKER_RULES for all_of in any_of for term in all_of},
+    key=len, reverse=True
+)) + '))')
+
+# Broad market ETFs when no rule matches
+_DEFAULT_SEARCH_TICKERS = ('SPY', 'VOO', 'VTI', 'IVV', 'QQQ', 'DIA')
+
+_EXPORT_HEADER = (
+    'Symbol', 'Thesis', 'Score', 'Rationale', 'Price',
+    'Market Cap', 'P/E Ratio', 'Div Yield %', 'YTD %', 'Date'
+)
+
+
+def _format_export_row(row: Tuple) -> Tuple:
+    """Format one thesis_alignments export row (in _EXPORT_HEADER order) for CSV."""
+    (symbol, thesis_name, score, rationale, price, market_cap,
+     pe_ratio, div_yield, year_perf, date) = row
+    return (
+        symbol,
+        thesis_name,
+        f"{score:.2f}",
+        rationale,
+        f"${price:.2f}" if price else 'N/A',
+        f"${market_cap:,.0f}" if market_cap else 'N/A',
+        f"{pe_ratio:.2f}" if pe_ratio else 'N/A',
+        f"{div_yield*100:.2f}%" if div_yield else 'N/A',
+        f"{year_perf:.2f}%" if year_perf else 'N/A',
+        date,
+    )
+
+
 class AutonomousEquityAnalyst:
     """Fully autonomous equity analyst using direct APIs."""
     
@@ -63,9 +184,23 @@ class AutonomousEquityAnalyst:
         self.db_path = db_path
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection tuned for this cache-like database: a crash only means
+        re-fetching, so commits skip the full fsync (WAL is set once at init).
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+    
     def _init_database(self):
         """Initialize SQLite database with required schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
+        # Persistent per database file; readers no longer block the writer
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
         
         # Create securities table
@@ -126,6 +261,12 @@ class AutonomousEquityAnalyst:
                 FOREIGN KEY (constituent_symbol) REFERENCES securities(symbol)
             )
         """)
+        # Reverse lookup (constituent -> ETFs); also serves DISTINCT constituent_symbol
+        # scans in backfill/status scripts from the index instead of the table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_etf_holdings_constituent
+            ON etf_holdings(constituent_symbol)
+        """)
 
         # Create thesis_alignments table
         cursor.execute("""
@@ -145,6 +286,12 @@ class AutonomousEquityAnalyst:
                 FOREIGN KEY (symbol) REFERENCES securities(symbol)
             )
         """)
+        # Per-thesis results ordered by score (export and get_thesis_results) read
+        # straight from the index instead of scanning and sorting the table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_thesis_alignments_thesis_score
+            ON thesis_alignments(thesis_id, alignment_score DESC)
+        """)
         
         conn.commit()
         conn.close()
@@ -167,15 +314,19 @@ class AutonomousEquityAnalyst:
         etf_searches = self._generate_search_tickers(query)
         
         results = []
-        for ticker in etf_searches[:max_results]:
-            try:
-                security_data = self._fetch_security_data(ticker)
-                if security_data:
-                    results.append(security_data)
-                    print(f"  [OK] Found: {ticker} - {security_data.get('name', 'N/A')}")
-            except Exception as e:
-                print(f"  [ERR] Error fetching {ticker}: {e}")
-                continue
+        # Fetch concurrently (network-bound); report in ticker order
+        with ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS) as pool:
+            futures = [(ticker, pool.submit(self._fetch_security_data, ticker))
+                       for ticker in etf_searches[:max_results]]
+            for ticker, future in futures:
+                try:
+                    security_data = future.result()
+                    if security_data:
+                        results.append(security_data)
+                        print(f"  [OK] Found: {ticker} - {security_data.get('name', 'N/A')}")
+                except Exception as e:
+                    print(f"  [ERR] Error fetching {ticker}: {e}")
+                    continue
         
         print(f"[OK] Found {len(results)} securities")
         return results
@@ -187,46 +338,18 @@ class AutonomousEquityAnalyst:
         This is a heuristic approach - in production you'd want a proper
         ticker search API or database.
         """
-        query_lower = query.lower()
+        # One scan of the query finds every rule term it contains
+        found = set(_SEARCH_TERMS_RE.findall(query.lower()))
         tickers = []
         
         # Common ETF prefixes/patterns
-        if 'small' in query_lower and 'cap' in query_lower:
-            tickers.extend(['IWM', 'IJR', 'SCHA', 'VB', 'SLYG', 'SLYV', 'VBR', 'VBK'])
-        
-        if 'mid' in query_lower and 'cap' in query_lower:
-            tickers.extend(['IJH', 'MDY', 'VO', 'SCHM', 'IWR', 'VXF'])
-        
-        if 'tech' in query_lower or 'technology' in query_lower:
-            tickers.extend(['XLK', 'VGT', 'QQQ', 'QTEC', 'SOXX', 'IGV', 'FDN'])
-        
-        if 'energy' in query_lower:
-            tickers.extend(['XLE', 'VDE', 'IYE', 'FENY', 'IXC', 'PXE'])
-        
-        if 'health' in query_lower or 'healthcare' in query_lower:
-            tickers.extend(['XLV', 'VHT', 'IYH', 'FHLC', 'IBB', 'XBI'])
-        
-        if 'financial' in query_lower or 'bank' in query_lower:
-            tickers.extend(['XLF', 'VFH', 'IYF', 'KBE', 'KRE', 'IAT'])
-        
-        if 'dividend' in query_lower or 'income' in query_lower:
-            tickers.extend(['VYM', 'DVY', 'SCHD', 'HDV', 'SDY', 'DGRO', 'VIG'])
-        
-        if 'value' in query_lower:
-            tickers.extend(['VTV', 'IVE', 'VOOV', 'SCHV', 'IWD', 'VBR'])
-        
-        if 'growth' in query_lower:
-            tickers.extend(['VUG', 'IVW', 'VOOG', 'SCHG', 'IWF', 'VBK'])
-        
-        if 'international' in query_lower or 'emerging' in query_lower:
-            tickers.extend(['VEA', 'IEFA', 'VWO', 'IEMG', 'EEM', 'VEU', 'IXUS'])
-        
-        if 'real estate' in query_lower or 'reit' in query_lower:
-            tickers.extend(['VNQ', 'IYR', 'SCHH', 'XLRE', 'RWR', 'USRT'])
+        for any_of, rule_tickers in _SEARCH_TICKER_RULES:
+            if any(found.issuperset(all_of) for all_of in any_of):
+                tickers.extend(rule_tickers)
         
         # Default broad market ETFs if no specific match
         if not tickers:
-            tickers.extend(['SPY', 'VOO', 'VTI', 'IVV', 'QQQ', 'DIA'])
+            tickers.extend(_DEFAULT_SEARCH_TICKERS)
         
         return list(dict.fromkeys(tickers))  # Remove duplicates while preserving order
     
@@ -235,7 +358,7 @@ class AutonomousEquityAnalyst:
         Load cached security from DB if price/performance data is fresh (< 7 days).
         Returns None if not found or stale (sector/description are not refetched; only price/performance).
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT symbol, name, asset_type, market_cap, sector, industry, gics_sector, gics_industry, "
@@ -308,6 +431,7 @@ class AutonomousEquityAnalyst:
         cached = self._load_security_from_db(ticker_upper)
         if cached:
             return cached
+        _yahoo_throttle.wait()
         try:
             stock = yf.Ticker(ticker)
             info = stock.info
@@ -361,46 +485,29 @@ class AutonomousEquityAnalyst:
             print(f"  Error fetching {ticker}: {e}")
             return None
     
-    def save_security(self, security: Dict):
-        """Save or update security in database, including price/performance for staleness cache."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        # Normalize before save
-        currency = _normalize_currency(security.get('currency')) or 'USD'
-        exchange = _normalize_exchange(security.get('exchange'))
-        div_yield = _normalize_dividend_yield(security.get('dividend_yield'))
+    def _security_row(self, security: Dict) -> Tuple:
+        """Normalize a security dict into a row tuple for _SAVE_SECURITY_SQL."""
         gics_sector = security.get('gics_sector')
         gics_industry = security.get('gics_industry')
-        sic_code = security.get('sic_code')
-        sic_description = security.get('sic_description')
         asset_class = security.get('asset_class')
-        sector = security.get('sector') or _derived_sector(gics_sector, asset_class)
-        industry = security.get('industry') or gics_industry
-        cursor.execute("""
-            INSERT OR REPLACE INTO securities 
-            (symbol, name, asset_type, market_cap, sector, industry, gics_sector, gics_industry,
-             sic_code, sic_description, asset_class, description, exchange, currency,
-             current_price, pe_ratio, dividend_yield, year_performance,
-             fifty_two_week_high, fifty_two_week_low, beta, volume, avg_volume, expense_ratio, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-        """, (
+        return (
             security['symbol'],
             security['name'],
             security.get('asset_type'),
             security.get('market_cap'),
-            sector,
-            industry,
+            security.get('sector') or _derived_sector(gics_sector, asset_class),
+            security.get('industry') or gics_industry,
             gics_sector,
             gics_industry,
-            sic_code,
-            sic_description,
+            security.get('sic_code'),
+            security.get('sic_description'),
             asset_class,
             security.get('description'),
-            exchange,
-            currency,
+            _normalize_exchange(security.get('exchange')),
+            _normalize_currency(security.get('currency')) or 'USD',
             security.get('current_price'),
             security.get('pe_ratio'),
-            div_yield,
+            _normalize_dividend_yield(security.get('dividend_yield')),
             security.get('year_performance'),
             security.get('fifty_two_week_high'),
             security.get('fifty_two_week_low'),
@@ -408,17 +515,35 @@ class AutonomousEquityAnalyst:
             security.get('volume'),
             security.get('avg_volume'),
             security.get('expense_ratio'),
-        ))
-        
+        )
+
+    def save_security(self, security: Dict):
+        """Save or update security in database, including price/performance for staleness cache."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(_SAVE_SECURITY_SQL, self._security_row(security))
         conn.commit()
         conn.close()
 
+    def save_securities_batch(self, securities: List[Dict]):
+        """
+        Save or update many securities in a single transaction (one executemany,
+        one commit) instead of a connection and commit per row.
+        """
+        if not securities:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(_SAVE_SECURITY_SQL, [self._security_row(s) for s in securities])
+        conn.close()
+
     def fetch_etf_holdings(self, ticker: str) -> Optional[List[Dict]]:
         """
         Fetch top holdings for an ETF from Yahoo Finance (yfinance).
         Returns list of {symbol, name, holding_percent} or None if not available.
         Yahoo provides exactly 10 top holdings.
         """
+        _yahoo_throttle.wait()
         try:
             stock = yf.Ticker(ticker)
             fd = stock.funds_data
@@ -455,36 +580,59 @@ class AutonomousEquityAnalyst:
         """
         if not holdings:
             return
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         etf_sym = etf_symbol.upper()
+        constituents = []
+        holding_rows = []
         for h in holdings:
             const_sym = (h.get('symbol') or '').strip().upper()
             if not const_sym:
                 continue
-            pct = h.get('holding_percent')
-            rank = h.get('holding_rank')
             name = (h.get('name') or const_sym).strip()
-            # Ensure constituent exists in securities
-            cursor.execute("SELECT 1 FROM securities WHERE symbol = ?", (const_sym,))
-            if cursor.fetchone() is None:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO securities (symbol, name, last_updated)
-                    VALUES (?, ?, datetime('now'))
-                """, (const_sym, name))
-            # Upsert holding
-            cursor.execute("""
+            constituents.append((const_sym, name))
+            holding_rows.append((etf_sym, const_sym, h.get('holding_percent'), h.get('holding_rank'), source))
+        conn = self._connect()
+        with conn:
+            # Ensure constituents exist in securities (OR IGNORE leaves existing rows alone)
+            conn.executemany("""
+                INSERT OR IGNORE INTO securities (symbol, name, last_updated)
+                VALUES (?, ?, datetime('now'))
+            """, constituents)
+            # Upsert holdings
+            conn.executemany("""
                 INSERT OR REPLACE INTO etf_holdings
                 (etf_symbol, constituent_symbol, holding_percent, holding_rank, source, last_updated)
                 VALUES (?, ?, ?, ?, ?, datetime('now'))
-            """, (etf_sym, const_sym, pct, rank, source))
-        conn.commit()
+            """, holding_rows)
         conn.close()
 
+    def _thesis_criteria(self, thesis: Dict) -> Dict:
+        """
+        Lowercased thesis fields used by calculate_alignment_score. Depends only on
+        the thesis, so callers scoring many securities build it once and pass it in.
+        """
+        description = thesis.get('description', '').lower()
+        if 'small cap' in description or 'small-cap' in description:
+            cap_band = 'small'
+        elif 'mid cap' in description or 'mid-cap' in description:
+            cap_band = 'mid'
+        elif 'large cap' in description or 'large-cap' in description:
+            cap_band = 'large'
+        else:
+            cap_band = None
+        return {
+            'keywords': [(kw, kw.lower()) for kw in thesis.get('keywords', [])],
+            'sectors': [s.lower() for s in thesis.get('sectors', [])],
+            'cap_band': cap_band,
+            'growth': 'growth' in description,
+            'value': 'value' in description,
+            'income': 'dividend' in description or 'income' in description,
+        }
+    
     def calculate_alignment_score(
         self, 
         security: Dict, 
-        thesis: Dict
+        thesis: Dict,
+        criteria: Optional[Dict] = None
     ) -> Tuple[float, str]:
         """
         Calculate how well a security aligns with an investment thesis.
@@ -492,6 +640,7 @@ class AutonomousEquityAnalyst:
         Args:
             security: Security data dictionary
             thesis: Investment thesis dictionary
+            criteria: Precomputed _thesis_criteria(thesis); built here if omitted
             
         Returns:
             Tuple of (score 0-100, rationale text)
@@ -500,16 +649,15 @@ class AutonomousEquityAnalyst:
         rationale_parts = []
         
         # Extract thesis criteria
-        thesis_keywords = thesis.get('keywords', [])
-        thesis_sectors = thesis.get('sectors', [])
-        thesis_description = thesis.get('description', '').lower()
+        if criteria is None:
+            criteria = self._thesis_criteria(thesis)
         
         # 1. Sector/Industry Match (30 points)
         security_sector = (security.get('sector') or '').lower()
         security_industry = (security.get('industry') or '').lower()
         
-        sector_match = any(s.lower() in security_sector or s.lower() in security_industry 
-                          for s in thesis_sectors)
+        sector_match = any(s in security_sector or s in security_industry 
+                          for s in criteria['sectors'])
         if sector_match:
             score += 30
             rationale_parts.append(f"Sector match: {security.get('sector')}")
@@ -517,7 +665,7 @@ class AutonomousEquityAnalyst:
         # 2. Keyword Match in Name/Description (25 points)
         security_text = f"{security.get('name', '')} {security.get('description', '')}".lower()
         
-        keyword_matches = [kw for kw in thesis_keywords if kw.lower() in security_text]
+        keyword_matches = [kw for kw, kw_lower in criteria['keywords'] if kw_lower in security_text]
         if keyword_matches:
             keyword_score = min(25, len(keyword_matches) * 8)
             score += keyword_score
@@ -525,34 +673,26 @@ class AutonomousEquityAnalyst:
         
         # 3. Market Cap Fit (15 points)
         market_cap = security.get('market_cap')
-        if market_cap:
-            if 'small cap' in thesis_description or 'small-cap' in thesis_description:
-                if market_cap < 2_000_000_000:  # < $2B
-                    score += 15
-                    rationale_parts.append("Small-cap fit")
-            elif 'mid cap' in thesis_description or 'mid-cap' in thesis_description:
-                if 2_000_000_000 <= market_cap <= 10_000_000_000:  # $2B-$10B
-                    score += 15
-                    rationale_parts.append("Mid-cap fit")
-            elif 'large cap' in thesis_description or 'large-cap' in thesis_description:
-                if market_cap > 10_000_000_000:  # > $10B
-                    score += 15
-                    rationale_parts.append("Large-cap fit")
-        
-        # 4. Performance Metrics (15 points)
-        year_perf = security.get('year_performance')
-        if year_perf is not None:
-            if 'growth' in thesis_description and year_perf > 15:
-                score += 10
-                rationale_parts.append(f"Strong growth: {year_perf:.1f}%")
-            elif 'value' in thesis_description and year_perf < 5:
-                score += 10
-                rationale_parts.append(f"Value opportunity: {year_perf:.1f}%")
-        
-        # 5. Dividend Yield (15 points)
-        div_yield = security.get('dividend_yield')
-        if div_yield:
-            if ('dividend' in thesis_description or 'income' in thesis_description) and div_yield > 0.02:
+        cap_band = criteria['cap_band']
+        if market_cap and cap_band and _market_cap_band(market_cap) == cap_band:
+            score += 15
+            rationale_parts.append(_CAP_BAND_RATIONALE[cap_band])
+        
+        # 4. Performance Metrics (15 points) - only for growth/value theses
+        if criteria['growth'] or criteria['value']:
+            year_perf = security.get('year_performance')
+            if year_perf is not None:
+                if criteria['growth'] and year_perf > 15:
+                    score += 10
+                    rationale_parts.append(f"Strong growth: {year_perf:.1f}%")
+                elif criteria['value'] and year_perf < 5:
+                    score += 10
+                    rationale_parts.append(f"Value opportunity: {year_perf:.1f}%")
+        
+        # 5. Dividend Yield (15 points) - only for income theses
+        if criteria['income']:
+            div_yield = security.get('dividend_yield')
+            if div_yield and div_yield > 0.02:
                 score += 15
                 rationale_parts.append(f"Dividend yield: {div_yield*100:.2f}%")
         
@@ -570,15 +710,45 @@ class AutonomousEquityAnalyst:
         rationale: str
     ):
         """Save thesis alignment analysis to database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO thesis_alignments 
-            (thesis_id, thesis_name, symbol, alignment_score, rationale, 
-             current_price, market_cap, pe_ratio, dividend_yield, year_performance)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(
+            _SAVE_ALIGNMENT_SQL,
+            self._alignment_row(thesis_id, thesis_name, security, alignment_score, rationale)
+        )
+        conn.commit()
+        conn.close()
+    
+    def save_thesis_alignments_batch(
+        self,
+        thesis_id: int,
+        thesis_name: str,
+        alignments: List[Tuple[Dict, float, str]]
+    ):
+        """
+        Save many (security, alignment_score, rationale) results for one thesis
+        in a single transaction instead of a connection and commit per row.
+        """
+        if not alignments:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(_SAVE_ALIGNMENT_SQL, [
+                self._alignment_row(thesis_id, thesis_name, security, score, rationale)
+                for security, score, rationale in alignments
+            ])
+        conn.close()
+    
+    def _alignment_row(
+        self,
+        thesis_id: int,
+        thesis_name: str,
+        security: Dict,
+        alignment_score: float,
+        rationale: str
+    ) -> Tuple:
+        """Row tuple for _SAVE_ALIGNMENT_SQL."""
+        return (
             thesis_id,
             thesis_name,
             security['symbol'],
@@ -589,10 +759,7 @@ class AutonomousEquityAnalyst:
             security.get('pe_ratio'),
             security.get('dividend_yield'),
             security.get('year_performance')
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
     def analyze_thesis(self, thesis: Dict, max_securities: int = 20) -> List[Dict]:
         """
@@ -620,23 +787,14 @@ class AutonomousEquityAnalyst:
         # Search for securities
         securities = self.search_securities(search_query, max_results=max_securities)
         
-        # Analyze each security
+        # Analyze each security (saved in two batches after the loop)
         results = []
+        alignments = []
+        criteria = self._thesis_criteria(thesis)
         for security in securities:
-            # Save security to database
-            self.save_security(security)
-            
             # Calculate alignment score
-            score, rationale = self.calculate_alignment_score(security, thesis)
-            
-            # Save alignment
-            self.save_thesis_alignment(
-                thesis_id=thesis['id'],
-                thesis_name=thesis['name'],
-                security=security,
-                alignment_score=score,
-                rationale=rationale
-            )
+            score, rationale = self.calculate_alignment_score(security, thesis, criteria)
+            alignments.append((security, score, rationale))
             
             # Add to results
             result = {
@@ -655,6 +813,10 @@ class AutonomousEquityAnalyst:
             print(f"    Score: {score}/100")
             print(f"    Rationale: {rationale}")
         
+        # Save securities, then their alignments, one transaction each
+        self.save_securities_batch(securities)
+        self.save_thesis_alignments_batch(thesis['id'], thesis['name'], alignments)
+        
         # Sort by score
         results.sort(key=lambda x: x['score'], reverse=True)
         
@@ -668,7 +830,7 @@ class AutonomousEquityAnalyst:
     
     def export_results(self, thesis_id: int, output_file: str = "thesis_analysis.csv"):
         """Export analysis results to CSV."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -681,37 +843,25 @@ class AutonomousEquityAnalyst:
             ORDER BY alignment_score DESC
         """, (thesis_id,))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        if not rows:
+        # Peek one row so an empty result never creates the file, then stream
+        # the rest straight from the cursor instead of materializing a list
+        first = cursor.fetchone()
+        if first is None:
+            conn.close()
             print(f"No results found for thesis_id {thesis_id}")
             return
         
         # Write CSV
         import csv
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'Symbol', 'Thesis', 'Score', 'Rationale', 'Price', 
-                'Market Cap', 'P/E Ratio', 'Div Yield %', 'YTD %', 'Date'
-            ])
-            
-            for row in rows:
-                # Format numeric values
-                formatted_row = [
-                    row[0],  # symbol
-                    row[1],  # thesis_name
-                    f"{row[2]:.2f}",  # score
-                    row[3],  # rationale
-                    f"${row[4]:.2f}" if row[4] else 'N/A',  # price
-                    f"${row[5]:,.0f}" if row[5] else 'N/A',  # market_cap
-                    f"{row[6]:.2f}" if row[6] else 'N/A',  # pe_ratio
-                    f"{row[7]*100:.2f}%" if row[7] else 'N/A',  # div_yield
-                    f"{row[8]:.2f}%" if row[8] else 'N/A',  # year_perf
-                    row[9]  # date
-                ]
-                writer.writerow(formatted_row)
+        try:
+            # 1 MiB buffer: far fewer write() syscalls than the 8 KiB default
+            with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(_EXPORT_HEADER)
+                writer.writerow(_format_export_row(first))
+                writer.writerows(map(_format_export_row, cursor))
+        finally:
+            conn.close()
         
         print(f"\n[OK] Results exported to: {output_file}")
 
@@ -34,6 +34,9 @@ COOKIE_URL = "https://etfdb.com/alpha/A/"  # Visit first to get Cloudflare cooki
 REQUEST_DELAY = 1.0  # Be polite to the server
 PER_PAGE = 25
 
+# Dollar multiplier for a trailing magnitude suffix on ETFDB asset strings
+_SUFFIX_MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
 
 def _setup_logging(log_path: Path = LOG_FILE) -> logging.Logger:
     """Configure file logger for scraper run."""
@@ -50,23 +53,22 @@ def _setup_logging(log_path: Path = LOG_FILE) -> logging.Logger:
 def _parse_assets(value) -> Optional[float]:
     """
     Parse ETFDB assets string to dollars (float).
-    ETFDB returns values in millions when no K/M/B suffix (e.g. '$3,079' = $3.079B).
+    ETFDB returns values in millions when no K/M/B/T suffix (e.g. '$3,079' = $3.079B).
     Strips $, commas. Returns value in dollars for consistency with Yahoo.
     """
     if value is None:
         return None
-    orig = str(value).strip().upper()
-    s = orig.replace("$", "").replace(",", "").replace(" ", "")
+    s = str(value).strip().upper().replace("$", "").replace(",", "").replace(" ", "")
     if not s or s == "N/A":
         return None
-    has_suffix = any(x in orig for x in ("K", "M", "B"))
-    s = s.replace("K", "e3").replace("M", "e6").replace("B", "e9")
+    # ETFDB plain numbers (no suffix) are in millions - convert to dollars
+    mult = _SUFFIX_MULTIPLIERS.get(s[-1])
+    if mult is None:
+        mult = 1e6
+    else:
+        s = s[:-1]
     try:
-        raw = float(s)
-        # ETFDB plain numbers (no K/M/B) are in millions - convert to dollars
-        if not has_suffix:
-            raw = raw * 1e6
-        return raw
+        return float(s) * mult
     except ValueError:
         return None
 
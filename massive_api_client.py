@@ -9,7 +9,7 @@ Requires POLYGON_API_KEY or MASSIVE_API_KEY for direct API. No mock data.
 """
 
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
@@ -19,6 +19,11 @@ try:
 except ImportError:
     HAS_REQUESTS = False
 
+from throttle import MinIntervalThrottle
+
+# Concurrent ticker-details requests; the 0.2s spacing between request starts still applies
+DETAILS_MAX_WORKERS = 5
+
 
 class MassiveAPIClient:
     """
@@ -43,7 +48,8 @@ class MassiveAPIClient:
         self.use_mcp = use_mcp
         self.api_key = api_key or os.environ.get("POLYGON_API_KEY") or os.environ.get("MASSIVE_API_KEY")
         self._use_direct_api = bool(self.api_key and HAS_REQUESTS)
-        self._last_polygon_call = 0
+        # 0.2s between request starts, shared by concurrent callers
+        self._throttle = MinIntervalThrottle(0.2)
         
     def list_tickers(self, 
                      search: Optional[str] = None,
@@ -75,6 +81,20 @@ class MassiveAPIClient:
 
         return {}
     
+    def get_ticker_details_batch(self, tickers: List[str], max_workers: int = DETAILS_MAX_WORKERS) -> Dict[str, Dict]:
+        """
+        Get ticker details for many tickers with up to max_workers requests in
+        flight. Returns {ticker: details}, with {} for tickers that have none
+        (as get_ticker_details).
+        """
+        if self.use_mcp:
+            raise NotImplementedError("MCP server communication not yet implemented")
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers or not self._use_direct_api:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as pool:
+            return dict(zip(tickers, pool.map(self.get_ticker_details, tickers)))
+    
     def get_previous_close(self, ticker: str) -> Dict:
         """
         Get previous day close data. Returns empty dict when no API key.
@@ -121,10 +141,7 @@ class MassiveAPIClient:
             return {}
         params = dict(params or {})
         params["apiKey"] = self.api_key
-        now = time.time()
-        if now - self._last_polygon_call < 0.2:
-            time.sleep(0.2 - (now - self._last_polygon_call))
-        self._last_polygon_call = time.time()
+        self._throttle.wait()
         try:
             r = requests.get(f"{self.POLYGON_BASE}{path}", params=params, timeout=10)
             r.raise_for_status()
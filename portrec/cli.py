@@ -4,6 +4,7 @@ CLI for Portfolio Recommendation Service.
 """
 
 import argparse
+import logging
 import sys
 from pathlib import Path
 
@@ -180,6 +181,8 @@ def cmd_run_background(args, config):
 
 
 def main():
+    # Surface data-source progress and errors (Alpha Vantage logs per-call detail at DEBUG)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     config = load_config()
 
     parser = argparse.ArgumentParser(prog="portrec", description="Portfolio Recommendation Service")
@@ -6,14 +6,19 @@ Uses Yahoo Finance (primary), optional Massive/Polygon, optional Alpha Vantage.
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 # Add parent directory for existing modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from equity_analyst_autonomous import AutonomousEquityAnalyst
 
+# Tickers fetched/enriched concurrently per thesis (Yahoo, Alpha Vantage and
+# Massive requests keep their own process-wide rate limits across threads)
+ANALYZE_MAX_WORKERS = 8
+
 
 class MultiSourceEquityAnalyst:
     """
@@ -53,6 +58,10 @@ class MultiSourceEquityAnalyst:
 
         self._massive_client = None
         self._av_client = None
+        # Alpha Vantage overviews by symbol for this analyst's lifetime, so a ticker
+        # scored under several theses costs one call from the 25/day budget.
+        # Only successful lookups are kept; failures get retried on the next thesis
+        self._av_overviews: Dict[str, Dict] = {}
 
         if self.enable_massive:
             try:
@@ -86,12 +95,14 @@ class MultiSourceEquityAnalyst:
 
         if self._massive_client:
             try:
-                for kw in (keywords[:3] or [search_query]):
-                    if not kw:
-                        continue
-                    results = self._massive_client.list_tickers(
-                        search=kw, ticker_type="ETF", limit=8
-                    )
+                terms = [kw for kw in (keywords[:3] or [search_query]) if kw]
+                # Searches overlap in flight; map keeps results in keyword order
+                with ThreadPoolExecutor(max_workers=max(1, len(terms))) as pool:
+                    searches = list(pool.map(
+                        lambda kw: self._massive_client.list_tickers(search=kw, ticker_type="ETF", limit=8),
+                        terms,
+                    ))
+                for results in searches:
                     for r in results:
                         t = r.get("ticker") if isinstance(r, dict) else r
                         if t and t not in base_tickers:
@@ -101,15 +112,19 @@ class MultiSourceEquityAnalyst:
 
         return list(dict.fromkeys(base_tickers))
 
-    def _enrich_with_massive(self, security: Dict) -> Dict:
-        """Enrich security with Massive/Polygon ticker details."""
+    def _enrich_with_massive(self, security: Dict, details: Optional[Dict] = None) -> Dict:
+        """
+        Enrich security with Massive/Polygon ticker details. Pass details when
+        already prefetched (get_ticker_details_batch) to skip the request.
+        """
         if not self._massive_client:
             return security
         symbol = security.get("symbol")
         if not symbol:
             return security
         try:
-            details = self._massive_client.get_ticker_details(symbol)
+            if details is None:
+                details = self._massive_client.get_ticker_details(symbol)
             if details:
                 if not security.get("sic_code") and details.get("sic_code"):
                     security["sic_code"] = details.get("sic_code")
@@ -124,8 +139,31 @@ class MultiSourceEquityAnalyst:
             pass
         return security
 
-    def _enrich_with_alpha_vantage(self, security: Dict) -> Dict:
-        """Optionally enrich security with Alpha Vantage overview."""
+    def _prefetch_av_overviews(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Alpha Vantage overviews for symbols, fetching those not yet memoized in one
+        batched call. A symbol looked up without data maps to {}; one missing from
+        the result (batch failed) is left to a per-symbol fetch.
+        """
+        if not self._av_client:
+            return {}
+        missing = [s for s in symbols if s and s not in self._av_overviews]
+        fetched = {}
+        if missing:
+            try:
+                fetched = self._av_client.get_company_overviews(missing)
+            except Exception as e:
+                print(f"  Alpha Vantage overview prefetch skipped: {e}")
+            self._av_overviews.update((s, o) for s, o in fetched.items() if o)
+        overviews = {s: o or {} for s, o in fetched.items()}
+        overviews.update((s, self._av_overviews[s]) for s in symbols if s in self._av_overviews)
+        return overviews
+
+    def _enrich_with_alpha_vantage(self, security: Dict, overview: Optional[Dict] = None) -> Dict:
+        """
+        Optionally enrich security with Alpha Vantage overview. Pass overview when
+        already prefetched (_prefetch_av_overviews) to skip the request.
+        """
         if not self._av_client:
             return security
 
@@ -134,7 +172,12 @@ class MultiSourceEquityAnalyst:
             return security
 
         try:
-            overview = self._av_client.get_company_overview(symbol)
+            if overview is None:
+                overview = self._av_overviews.get(symbol)
+            if overview is None:
+                overview = self._av_client.get_company_overview(symbol)
+                if overview:
+                    self._av_overviews[symbol] = overview
             if overview:
                 if not security.get("gics_sector") and overview.get("Sector"):
                     security["gics_sector"] = overview.get("Sector")
@@ -171,26 +214,43 @@ class MultiSourceEquityAnalyst:
         # Get tickers from discovery (heuristic + Massive)
         tickers = self._get_discovery_tickers(thesis)[:max_securities]
 
+        # Fetch from Yahoo in worker threads (network-bound), collected in discovery order
+        fetched = []
+        with ThreadPoolExecutor(max_workers=ANALYZE_MAX_WORKERS) as pool:
+            futures = [(ticker, pool.submit(self.analyst._fetch_security_data, ticker)) for ticker in tickers]
+            for ticker, future in futures:
+                try:
+                    security = future.result()
+                    if security:
+                        fetched.append((ticker, security))
+                except Exception as e:
+                    print(f"  Error analyzing {ticker}: {e}")
+
+        # Massive details and Alpha Vantage overviews only for the tickers Yahoo
+        # resolved, each batched under its client's rate limit
+        symbols = [security.get("symbol") for _, security in fetched]
+        massive_details = {}
+        if self._massive_client:
+            try:
+                massive_details = self._massive_client.get_ticker_details_batch(symbols)
+            except Exception as e:
+                print(f"  Massive details prefetch skipped: {e}")
+        av_overviews = self._prefetch_av_overviews(symbols)
+
+        criteria = self.analyst._thesis_criteria(thesis)
         results = []
-        for ticker in tickers:
+        securities = []
+        alignments = []
+        # Score on this thread, then save in one batch so SQLite has one writer
+        for ticker, security in fetched:
             try:
-                security = self.analyst._fetch_security_data(ticker)
-                if not security:
-                    continue
-
-                # Enrich with Massive/Polygon and Alpha Vantage when available
-                security = self._enrich_with_massive(security)
-                security = self._enrich_with_alpha_vantage(security)
-
-                self.analyst.save_security(security)
-                score, rationale = self.analyst.calculate_alignment_score(security, thesis)
-                self.analyst.save_thesis_alignment(
-                    thesis_id=thesis.get("id", thesis.get("name", "")),
-                    thesis_name=thesis.get("name", thesis.get("title", "")),
-                    security=security,
-                    alignment_score=score,
-                    rationale=rationale,
-                )
+                symbol = security.get("symbol")
+                # A symbol missing from a prefetch (batch failed) falls back to its own request
+                security = self._enrich_with_massive(security, massive_details.get(symbol))
+                security = self._enrich_with_alpha_vantage(security, av_overviews.get(symbol))
+                score, rationale = self.analyst.calculate_alignment_score(security, thesis, criteria)
+                securities.append(security)
+                alignments.append((security, score, rationale))
 
                 results.append({
                     "symbol": security["symbol"],
@@ -206,40 +266,52 @@ class MultiSourceEquityAnalyst:
                 print(f"  Error analyzing {ticker}: {e}")
                 continue
 
+        # Two transactions for the whole thesis instead of two commits per ticker
+        self.analyst.save_securities_batch(securities)
+        self.analyst.save_thesis_alignments_batch(
+            thesis.get("id", thesis.get("name", "")),
+            thesis.get("name", thesis.get("title", "")),
+            alignments,
+        )
+
         results.sort(key=lambda x: x["score"], reverse=True)
         return results
 
     def get_thesis_results(self, thesis_id: str, limit: int = 20) -> List[Dict]:
         """Get stored analysis results for a thesis."""
+        return list(self.iter_thesis_results(thesis_id, limit=limit))
+
+    def iter_thesis_results(self, thesis_id: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield stored analysis results for a thesis, best score first, streaming
+        from the cursor (limit=None for all). Stop early to skip the remaining rows.
+        """
         import sqlite3
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT symbol, thesis_name, alignment_score, rationale,
-                   current_price, market_cap, pe_ratio, dividend_yield,
-                   year_performance
-            FROM thesis_alignments
-            WHERE thesis_id = ?
-            ORDER BY alignment_score DESC
-            LIMIT ?
-        """, (thesis_id, limit))
-        rows = cursor.fetchall()
-        conn.close()
-
-        return [
-            {
-                "symbol": r[0],
-                "thesis_name": r[1],
-                "score": r[2],
-                "rationale": r[3],
-                "current_price": r[4],
-                "market_cap": r[5],
-                "pe_ratio": r[6],
-                "dividend_yield": r[7],
-                "year_performance": r[8],
-            }
-            for r in rows
-        ]
+        try:
+            cursor = conn.execute("""
+                SELECT symbol, thesis_name, alignment_score, rationale,
+                       current_price, market_cap, pe_ratio, dividend_yield,
+                       year_performance
+                FROM thesis_alignments
+                WHERE thesis_id = ?
+                ORDER BY alignment_score DESC
+                LIMIT ?
+            """, (thesis_id, -1 if limit is None else limit))
+            for r in cursor:
+                yield {
+                    "symbol": r[0],
+                    "thesis_name": r[1],
+                    "score": r[2],
+                    "rationale": r[3],
+                    "current_price": r[4],
+                    "market_cap": r[5],
+                    "pe_ratio": r[6],
+                    "dividend_yield": r[7],
+                    "year_performance": r[8],
+                }
+        finally:
+            conn.close()
 
     def export_results(self, thesis_id: str, output_file: str):
         """Delegate to autonomous analyst export."""
@@ -5,7 +5,8 @@ Uses REST API when POLYGON_API_KEY or MASSIVE_API_KEY is set.
 """
 
 import os
-import time
+import sys
+from pathlib import Path
 from typing import List, Optional
 
 try:
@@ -14,6 +15,11 @@ try:
 except ImportError:
     HAS_REQUESTS = False
 
+# Add parent directory for existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from throttle import MinIntervalThrottle
+
 
 class PolygonDirectClient:
     """Direct API client for Polygon.io ticker reference."""
@@ -24,8 +30,7 @@ class PolygonDirectClient:
         self.api_key = api_key or os.environ.get("POLYGON_API_KEY") or os.environ.get("MASSIVE_API_KEY")
         if not self.api_key:
             raise ValueError("Polygon API key required")
-        self._last_call = 0
-        self._min_interval = 0.2  # Rate limit friendly
+        self._throttle = MinIntervalThrottle(0.2)  # Rate limit friendly
 
     def _request(self, path: str, params: dict = None) -> dict:
         if not HAS_REQUESTS:
@@ -33,11 +38,7 @@ class PolygonDirectClient:
         params = params or {}
         params["apiKey"] = self.api_key
         url = f"{self.BASE_URL}{path}"
-        now = time.time()
-        elapsed = now - self._last_call
-        if elapsed < self._min_interval:
-            time.sleep(self._min_interval - elapsed)
-        self._last_call = time.time()
+        self._throttle.wait()
         try:
             r = requests.get(url, params=params, timeout=10)
             r.raise_for_status()
@@ -123,37 +123,36 @@ def generate_recommendations(
     removals = []
     holds = []
 
-    if consider_removals or True:  # Always compute holds for context
-        # Build symbol -> best score across theses
-        symbol_scores = {}
-        for thesis_id, results in thesis_results.items():
-            thesis_name = results[0]["thesis_name"] if results else thesis_id
-            for r in results:
-                symbol = r.get("symbol", "").upper()
-                score = r.get("score", 0)
-                if symbol not in symbol_scores or score > symbol_scores[symbol]["score"]:
-                    symbol_scores[symbol] = {
-                        "score": score,
-                        "rationale": r.get("rationale", ""),
-                        "thesis_name": thesis_name,
-                    }
-
-        for pos in portfolio:
-            symbol = pos["symbol"]
-            info = symbol_scores.get(symbol, {"score": 0, "rationale": "No thesis alignment", "thesis_name": ""})
-            if info["score"] >= add_threshold:
-                holds.append({
-                    "symbol": symbol,
-                    "description": pos["description"],
-                    "score": info["score"],
-                    "rationale": info["rationale"],
-                })
-            elif consider_removals and info["score"] < removal_threshold:
-                removals.append({
-                    "symbol": symbol,
-                    "description": pos["description"],
-                    "rationale": f"Low alignment ({info['score']:.0f}) with selected theses; {info['rationale']}",
-                })
+    # Build symbol -> best score across theses (holds are always computed for context)
+    symbol_scores = {}
+    for thesis_id, results in thesis_results.items():
+        thesis_name = results[0]["thesis_name"] if results else thesis_id
+        for r in results:
+            symbol = r.get("symbol", "").upper()
+            score = r.get("score", 0)
+            if symbol not in symbol_scores or score > symbol_scores[symbol]["score"]:
+                symbol_scores[symbol] = {
+                    "score": score,
+                    "rationale": r.get("rationale", ""),
+                    "thesis_name": thesis_name,
+                }
+
+    for pos in portfolio:
+        symbol = pos["symbol"]
+        info = symbol_scores.get(symbol, {"score": 0, "rationale": "No thesis alignment", "thesis_name": ""})
+        if info["score"] >= add_threshold:
+            holds.append({
+                "symbol": symbol,
+                "description": pos["description"],
+                "score": info["score"],
+                "rationale": info["rationale"],
+            })
+        elif consider_removals and info["score"] < removal_threshold:
+            removals.append({
+                "symbol": symbol,
+                "description": pos["description"],
+                "rationale": f"Low alignment ({info['score']:.0f}) with selected theses; {info['rationale']}",
+            })
 
     return {
         "add": adds,
@@ -9,6 +9,19 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_list(values) -> str:
+    """Compact JSON for a stored list column; empty/missing skips the encoder."""
+    if not values:
+        return "[]"
+    return json.dumps(values, separators=(",", ":"))
+
 
 class ThesisStore:
     """Persist theses and record selection/priority for research."""
@@ -63,14 +76,20 @@ class ThesisStore:
         if not path.exists():
             raise FileNotFoundError(f"Theses file not found: {json_path}")
 
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
+        if HAS_ORJSON:
+            # orjson parses the raw bytes several times faster than json.load
+            data = orjson.loads(path.read_bytes())
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
 
         theses = data.get("theses", data) if isinstance(data, dict) else data
         if not isinstance(theses, list):
             raise ValueError("JSON must contain 'theses' array or be an array of theses")
 
         count = 0
+        # One import timestamp for every new thesis in the file
+        now_iso = datetime.now().isoformat()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
@@ -78,23 +97,20 @@ class ThesisStore:
             thesis_id = str(t.get("id", t.get("name", "")))
             title = t.get("name", t.get("title", thesis_id))
             description = t.get("description", "")
-            keywords = json.dumps(t.get("keywords", []))
-            sectors = json.dumps(t.get("sectors", []))
-
-            cursor.execute("SELECT priority, selected, created_at FROM theses WHERE id = ?",
-                           (thesis_id,))
-            existing = cursor.fetchone()
-            if existing:
-                priority, selected, created_at = existing
-            else:
-                priority, selected, created_at = 0, 0, datetime.now().isoformat()
+            keywords = _json_list(t.get("keywords"))
+            sectors = _json_list(t.get("sectors"))
 
+            # Upsert: re-imports refresh content but keep priority, selection and created_at
             cursor.execute("""
-                INSERT OR REPLACE INTO theses
+                INSERT INTO theses
                 (id, title, description, keywords, sectors, priority, selected, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (thesis_id, title, description, keywords, sectors,
-                  priority, selected, created_at))
+                VALUES (?, ?, ?, ?, ?, 0, 0, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    keywords = excluded.keywords,
+                    sectors = excluded.sectors
+            """, (thesis_id, title, description, keywords, sectors, now_iso))
 
             count += 1
 
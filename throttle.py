@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Minimum-interval request throttle shared across threads.
+
+Used for the Yahoo Finance fetches in equity_analyst_autonomous and the
+Polygon/Massive REST clients, so concurrent workers still space their
+request starts the way a single sequential caller would.
+"""
+
+import threading
+import time
+
+
+class MinIntervalThrottle:
+    """Space call starts at least `interval` seconds apart across all threads"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last = 0.0  # time.monotonic() start of the latest reserved slot
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until this caller's slot comes up."""
+        # Reserve the slot under the lock, then sleep outside it so other callers
+        # can queue behind without blocking (monotonic: immune to clock jumps)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._last + self.interval)
+            self._last = slot
+        if slot > now:
+            time.sleep(slot - now)